@@ -15,10 +15,17 @@
 # Created with Claude AI
 # Copyright (C) 2024 Anson Phong : @ansonphong : https://phong.com
 
+import os
+import re
 import json
+import atexit
 import random
-import logging
 import shutil
+import logging
+import operator
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Set, Dict, Tuple
 
@@ -26,112 +33,262 @@ from post_x import XPoster
 from post_instagram import InstagramPoster
 from post_base import PostContent
 
+# orjson parses straight from bytes in C; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+@functools.lru_cache(maxsize=8)
+def _load_config(path: str, _mtime: float) -> dict:
+    """Parse a config file, memoized on (path, mtime) for repeated runs."""
+    return _json_loads(Path(path).read_bytes())
+
+# Media extensions recognized when grouping post files
+_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif'})
+_VIDEO_EXTS = frozenset({'.mp4', '.mov'})
+
+# Extension -> content kind, so the build loop dispatches with one dict
+# lookup instead of chained set-membership tests
+_EXT_KIND = {'.txt': 'text'}
+_EXT_KIND.update(dict.fromkeys(_IMAGE_EXTS, 'image'))
+_EXT_KIND.update(dict.fromkeys(_VIDEO_EXTS, 'video'))
+
+# Strips an optional numeric suffix and/or trailing -alt marker from a stem,
+# e.g. "sunset-2-alt" -> "sunset", "sunset-3" -> "sunset"
+_SUFFIX_RE = re.compile(r'(?:-\d+)?(?:-alt)?$')
+
+@functools.lru_cache(maxsize=4096)
+def _get_basename_without_number(filename: str) -> str:
+    """Extract basename without number suffix and alt suffix.
+
+    Stateless, so it lives at module level with an LRU cache: the same
+    filenames recur between the posts scan and the posted-index
+    bootstrap, and repeat runs in one process skip the string work.
+    """
+    return _SUFFIX_RE.sub('', os.path.splitext(filename)[0])
+
+def _basenames(names) -> Set[str]:
+    """Strip suffixes from an iterable of filenames in one pass."""
+    return {_get_basename_without_number(n) for n in names}
+
 class PhongBot:
     def __init__(self, config_file: str = "config.json"):
         """Initialize the social media bot."""
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('phong_bot.log'),
-                logging.StreamHandler()
-            ]
-        )
+        # Setup logging (once; basicConfig mutates global state and repeated
+        # bot constructions shouldn't stack handlers)
+        if not logging.getLogger().handlers:
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s',
+                handlers=[
+                    logging.FileHandler('phong_bot.log', delay=True),
+                    logging.StreamHandler()
+                ]
+            )
         self.logger = logging.getLogger(__name__)
         
         # Load configuration
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)
+        self.config = _load_config(config_file, os.stat(config_file).st_mtime)
         
-        # Initialize posters
-        self.posters = []
+        # Register poster factories; clients are only constructed (network
+        # auth included) once there is actually something to post
+        self._poster_factories = []
         if self.config['x']['enabled']:
-            self.posters.append(XPoster(self.config))
+            self._poster_factories.append(XPoster)
         if self.config['instagram']['enabled']:
-            self.posters.append(InstagramPoster(self.config))
-        
-        if not self.posters:
+            self._poster_factories.append(InstagramPoster)
+
+        if not self._poster_factories:
             self.logger.warning("No social media platforms are enabled in config")
         
         # Initialize paths
         self.posts_dir = Path(self.config['content']['posts_directory'])
         self.posted_dir = self.posts_dir / "posted"
+        self.posted_index = self.posts_dir / ".posted_index"
+        self.scan_cache = self.posts_dir / ".scan_cache.json"
+        self._posted_path_str = str(self.posted_dir)
         
-        # Create required directories
-        self.posts_dir.mkdir(exist_ok=True)
-        self.posted_dir.mkdir(exist_ok=True)
+        # Create required directories; on steady-state runs they always
+        # exist, and the isdir check is served from the dentry cache while
+        # mkdir always traps into the filesystem
+        if not os.path.isdir(self.posts_dir):
+            self.posts_dir.mkdir(exist_ok=True)
+        if not os.path.isdir(self.posted_dir):
+            self.posted_dir.mkdir(exist_ok=True)
+
+        # Cached result of _scan_posts, invalidated when files are moved
+        self._post_index_cache = None
+
+        # Posted-basename set memoized against the index file's mtime
+        self._posted_cache = None
+        self._posted_mtime = None
+
+        # Append-mode fd for the posted index, opened lazily on first write
+        self._posted_fd = None
+
+    @functools.cached_property
+    def posters(self) -> List:
+        """Instantiate the enabled platform posters on first use."""
+        return [factory(self.config) for factory in self._poster_factories]
 
     def _get_posted_basenames(self) -> Set[str]:
-        """Get set of already posted basenames by checking posted directory."""
-        posted_files = list(self.posted_dir.iterdir())
-        return {self._get_basename_without_number(f.name) for f in posted_files if f.is_file()}
-
-    def _get_available_posts(self) -> List[str]:
-        """Get list of available posts that haven't been posted."""
-        # Get all files that don't start with .
-        all_files = {f.name for f in self.posts_dir.iterdir() if f.is_file() and not f.name.startswith('.')}
-        
-        # Get unique basenames, removing both numeric suffixes and alt suffixes
-        unique_basenames = {self._get_basename_without_number(f) for f in all_files}
+        """Get set of already posted basenames from the append-only index file.
+
+        The index replaces a full scan of the ever-growing posted/ directory
+        with one buffered file read. Existing deployments are bootstrapped
+        from a single directory listing on first run.
+        """
+        try:
+            mtime = os.stat(self.posted_index).st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if self._posted_cache is not None and mtime == self._posted_mtime and mtime is not None:
+            return self._posted_cache
+
+        if mtime is not None:
+            posted = set(self.posted_index.read_text(encoding='utf-8').splitlines())
+        else:
+            # Bootstrap the index from the posted/ directory
+            with os.scandir(self.posted_dir) as it:
+                posted = _basenames(e.name for e in it if e.is_file())
+            if posted:
+                self.posted_index.write_text('\n'.join(sorted(posted)) + '\n', encoding='utf-8')
+                mtime = os.stat(self.posted_index).st_mtime
+
+        self._posted_cache = posted
+        self._posted_mtime = mtime
+        return posted
+
+    def _record_posted(self, basename: str):
+        """Append a basename to the posted index file and in-memory cache."""
+        # O_APPEND fd kept open across posts: one write syscall per record,
+        # no text-mode buffering or per-call open/close
+        if self._posted_fd is None:
+            self._posted_fd = os.open(
+                str(self.posted_index),
+                os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                0o644
+            )
+            atexit.register(os.close, self._posted_fd)
+        os.write(self._posted_fd, (basename + '\n').encode('utf-8'))
+        # Keep the memoized set current so the next cycle skips the reload
+        if self._posted_cache is not None:
+            self._posted_cache.add(basename)
+        self._posted_mtime = os.stat(self.posted_index).st_mtime
+
+    def _scan_posts(self) -> Dict[str, List[os.DirEntry]]:
+        """Scan the posts directory once, grouping entries by stripped basename.
+
+        The listing is cached so repeated calls within one run don't hit the
+        filesystem again; _move_to_posted invalidates it.
+        """
+        if self._post_index_cache is not None:
+            return self._post_index_cache
+
+        index = defaultdict(list)
+        with os.scandir(self.posts_dir) as it:
+            for entry in it:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                index[_get_basename_without_number(entry.name)].append(entry)
+        self._post_index_cache = dict(index)
+        return self._post_index_cache
+
+    def _load_scan_cache(self) -> List[str]:
+        """Return the cached available list if the posts dir is unchanged.
+
+        Returns None when the cache is missing or stale. The payload stores
+        the posts directory's mtime at scan time; any file added, moved, or
+        removed bumps that mtime and invalidates the cache.
+        """
+        try:
+            data = _json_loads(self.scan_cache.read_bytes())
+            if data.get('mtime') == os.stat(self.posts_dir).st_mtime:
+                return data.get('available', [])
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _save_scan_cache(self, available: List[str]):
+        """Persist the available basenames keyed to the directory mtime."""
+        try:
+            # Create the file first: creation bumps the directory mtime, and
+            # the recorded value must reflect that so the cache reads fresh
+            self.scan_cache.touch()
+            payload = {'mtime': os.stat(self.posts_dir).st_mtime, 'available': sorted(available)}
+            self.scan_cache.write_text(json.dumps(payload), encoding='utf-8')
+        except OSError as e:
+            self.logger.warning(f"Could not write scan cache: {e}")
+
+    def _choose_random_post(self, index: Dict[str, List[os.DirEntry]]) -> str:
+        """Pick a random unposted basename via reservoir sampling.
+
+        Streams the scan index once with O(1) extra memory instead of
+        materializing the full available list just to choose one entry.
+        Returns None when everything has already been posted.
+        """
         posted_basenames = self._get_posted_basenames()
-        
-        self.logger.info(f"Found files: {all_files}")
-        self.logger.info(f"Unique basenames: {unique_basenames}")
+
+        self.logger.info(f"Unique basenames: {set(index)}")
         self.logger.info(f"Posted basenames: {posted_basenames}")
-        
-        return list(unique_basenames - posted_basenames)
 
-    def _get_basename_without_number(self, filename: str) -> str:
-        """Extract basename without number suffix and alt suffix."""
-        base = Path(filename).stem
-        
-        # First remove the -alt suffix if present
-        if base.endswith('-alt'):
-            base = base[:-4]  # Remove '-alt'
-            
-        # Then handle numeric suffix
-        if '-' in base:
-            parts = base.rsplit('-', 1)
-            if parts[1].isdigit():
-                return parts[0]
-                
-        return base
-
-    def _build_post_content(self, basename: str) -> PostContent:
-        """Build post content object from files matching basename."""
+        chosen = None
+        n = 0
+        for basename in index:
+            if basename in posted_basenames:
+                continue
+            n += 1
+            if random.randrange(n) == 0:
+                chosen = basename
+        return chosen
+
+    def _build_post_content(self, basename: str, entries: List[os.DirEntry]) -> PostContent:
+        """Build post content object from the pre-grouped directory entries."""
         post = PostContent(basename=basename)
         self.logger.info(f"Building post content for basename: {basename}")
+        self.logger.info(f"Found {len(entries)} files matching basename: {[e.name for e in entries]}")
+
+        # Per-file logging is DEBUG-only; guard so the hot loop pays no
+        # formatting or handler I/O at the default INFO level
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+
+        image_entries = []
+        for entry in entries:
+            stem, suffix = os.path.splitext(entry.name)
+            kind = _EXT_KIND.get(suffix.lower())
+
+            if debug:
+                self.logger.debug("Processing file: %s (kind: %s, stem: %s)", entry.path, kind, stem)
+
+            if kind == 'text':
+                data = Path(entry.path).read_text(encoding='utf-8')
+                # Only pay for strip() when there is whitespace to remove
+                content = data.strip() if (data[:1].isspace() or data[-1:].isspace()) else data
+                if stem.endswith('-alt'):
+                    post.alt_text = content
+                    if debug:
+                        self.logger.debug("Added alt text: %d chars", len(content))
+                else:
+                    post.main_text = content
+                    if debug:
+                        self.logger.debug("Added main text: %d chars", len(content))
+            elif kind == 'image':
+                image_entries.append(entry)
+                if debug:
+                    self.logger.debug("Added image: %s", entry.path)
+            elif kind == 'video':
+                post.video = entry.path
+                if debug:
+                    self.logger.debug("Added video: %s", entry.path)
         
-        # List all matching files before processing
-        files = list(self.posts_dir.glob(f"{basename}*"))
-        self.logger.info(f"Found {len(files)} files matching basename: {[f.name for f in files]}")
-        
-        for file in files:
-            suffix = file.suffix.lower()
-            stem = file.stem
-            
-            # Log each file being processed
-            self.logger.info(f"Processing file: {file} (suffix: {suffix}, stem: {stem})")
-            
-            if suffix == '.txt':
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if stem.endswith('-alt'):
-                        post.alt_text = content
-                        self.logger.info(f"Added alt text: {len(content)} chars")
-                    else:
-                        post.main_text = content
-                        self.logger.info(f"Added main text: {len(content)} chars")
-            elif suffix in {'.jpg', '.jpeg', '.png', '.gif'}:
-                post.images.append(str(file))
-                self.logger.info(f"Added image: {file}")
-            elif suffix in {'.mp4', '.mov'}:
-                post.video = str(file)
-                self.logger.info(f"Added video: {file}")
-        
-        if post.images:
-            post.images.sort()
+        if image_entries:
+            # Sort on entry names (short strings, C-level getter) rather than
+            # full path strings
+            image_entries.sort(key=operator.attrgetter('name'))
+            post.images = [e.path for e in image_entries]
             self.logger.info(f"Final image list: {post.images}")
             
         # Log final post content summary
@@ -143,14 +300,24 @@ class PhongBot:
         
         return post
 
-    def _move_to_posted(self, basename: str):
+    def _move_to_posted(self, basename: str, entries: List[os.DirEntry]):
         """Move all files with given basename to posted directory."""
         try:
-            files = list(self.posts_dir.glob(f"{basename}*"))
-            for file in files:
-                target_path = self.posted_dir / file.name
-                shutil.move(str(file), str(target_path))
-                self.logger.info(f"Moved {file.name} to posted directory")
+            for entry in entries:
+                # posted/ lives inside posts_dir, so this is always a
+                # same-filesystem rename: one syscall, no shutil fallback logic
+                target = os.path.join(self._posted_path_str, entry.name)
+                try:
+                    os.replace(entry.path, target)
+                except OSError:
+                    # Cross-device fallback (e.g. posted/ symlinked onto
+                    # another filesystem, where rename raises EXDEV):
+                    # shutil.move copies and deletes the original, so an
+                    # already-posted file never stays behind to be re-posted
+                    shutil.move(entry.path, target)
+            self.logger.info("Moved %d files for %s to posted directory", len(entries), basename)
+            self._record_posted(basename)
+            self._post_index_cache = None
         except Exception as e:
             self.logger.error(f"Error moving files to posted directory: {e}")
             raise
@@ -158,24 +325,41 @@ class PhongBot:
     def post_random_content(self) -> bool:
         """Post random content to all enabled platforms."""
         try:
-            available_posts = self._get_available_posts()
-            
-            if not available_posts:
+            # Steady-state fast path: if the directory hasn't changed since
+            # the last scan found nothing to post, skip the scan entirely
+            cached_available = self._load_scan_cache()
+            if cached_available is not None and not cached_available:
+                self.logger.info("No new content available to post (scan cache fresh)")
+                return False
+
+            index = self._scan_posts()
+            selected_basename = self._choose_random_post(index)
+
+            if selected_basename is None:
+                self._save_scan_cache([])
                 self.logger.info("No new content available to post")
                 return False
-                
-            if not self.posters:
+
+            if not self._poster_factories:
                 self.logger.error("No social media platforms are enabled")
                 return False
+
+            post_content = self._build_post_content(selected_basename, index[selected_basename])
             
-            selected_basename = random.choice(available_posts)
-            post_content = self._build_post_content(selected_basename)
-            
-            # Track posting results for each platform
-            posting_results = {
-                poster.__class__.__name__: poster.post_content(post_content)
-                for poster in self.posters
-            }
+            # Post to all platforms concurrently; each post is independent
+            # network I/O, so wall time is bounded by the slowest platform
+            def _post_one(poster) -> bool:
+                try:
+                    return poster.post_content(post_content)
+                except Exception as e:
+                    self.logger.error(f"Error posting to {poster.__class__.__name__}: {e}")
+                    return False
+
+            with ThreadPoolExecutor(max_workers=len(self.posters)) as executor:
+                posting_results = dict(zip(
+                    [poster.__class__.__name__ for poster in self.posters],
+                    executor.map(_post_one, self.posters)
+                ))
             
             # Log results for each platform
             for platform, success in posting_results.items():
@@ -184,7 +368,7 @@ class PhongBot:
             
             # If at least one platform was successful, move to posted
             if any(posting_results.values()):
-                self._move_to_posted(selected_basename)
+                self._move_to_posted(selected_basename, index[selected_basename])
                 self.logger.info(f"At least one platform succeeded, moved content to posted: {selected_basename}")
                 return True
             else:
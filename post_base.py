@@ -1,22 +1,19 @@
 import os
+import stat as stat_module
 import logging
 from pathlib import Path
 from typing import List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
-@dataclass
+@dataclass(slots=True)
 class PostContent:
     basename: str
     main_text: Optional[str] = None
     alt_text: Optional[str] = None
-    images: List[str] = None
+    images: List[str] = field(default_factory=list)
     video: Optional[str] = None
 
-    def __post_init__(self):
-        if self.images is None:
-            self.images = []
-
 class BasePoster(ABC):
     def __init__(self, config: dict):
         """Initialize base poster with configuration."""
@@ -24,22 +21,48 @@ class BasePoster(ABC):
         
         # Setup logging
         self.logger = logging.getLogger(self.__class__.__name__)
-        
-        # Add platform-specific file handler
-        fh = logging.FileHandler(f"{self.__class__.__name__.lower()}.log")
-        fh.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(fh)
+
+        # Add platform-specific file handler once per logger; repeated
+        # instantiation must not stack duplicate handlers (doubled writes,
+        # leaked file descriptors). delay=True defers opening the log file
+        # until a record is actually emitted.
+        log_name = f"{self.__class__.__name__.lower()}.log"
+        if not any(isinstance(h, logging.FileHandler) and h.baseFilename.endswith(log_name)
+                   for h in self.logger.handlers):
+            fh = logging.FileHandler(log_name, delay=True)
+            fh.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            self.logger.addHandler(fh)
 
     @abstractmethod
     def post_content(self, post: PostContent) -> bool:
         """Post content to platform. Must be implemented by subclasses."""
         pass
 
-    def _validate_media_file(self, filepath: str) -> bool:
-        """Validate media file before upload."""
+    def _validate_media_file(self, filepath: str,
+                             stat_result: Optional[os.stat_result] = None) -> bool:
+        """Validate media file before upload.
+
+        A single os.stat covers existence, type, and size; readability is
+        left for the uploader's open() to raise on, rather than paying an
+        extra access() syscall per file here. Callers that already hold a
+        stat result (batch validation) can pass it to skip the syscall.
+        """
         try:
-            file_size = os.path.getsize(filepath)
-            
+            if stat_result is not None:
+                st = stat_result
+            else:
+                try:
+                    st = os.stat(filepath)
+                except FileNotFoundError:
+                    self.logger.error(f"File {filepath} does not exist")
+                    return False
+
+            if not stat_module.S_ISREG(st.st_mode):
+                self.logger.error(f"File {filepath} is not a regular file")
+                return False
+
+            file_size = st.st_size
+
             # Check if it's a video
             if filepath.lower().endswith(('.mp4', '.mov')):
                 max_size = self.config['content']['max_video_size_mb'] * 1024 * 1024
@@ -51,19 +74,10 @@ class BasePoster(ABC):
                 if file_size > max_size:
                     self.logger.error(f"Image file {filepath} exceeds {self.config['content']['max_image_size_mb']}MB limit")
                     return False
-            
-            # Check file existence and accessibility
-            if not os.path.isfile(filepath):
-                self.logger.error(f"File {filepath} does not exist")
-                return False
-                
-            if not os.access(filepath, os.R_OK):
-                self.logger.error(f"File {filepath} is not readable")
-                return False
-                
+
             self.logger.info(f"File {filepath} validated successfully ({file_size/1024/1024:.2f}MB)")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Error validating file {filepath}: {str(e)}")
             return False
@@ -1,7 +1,11 @@
+import io
+import hashlib
 import logging
 import json
 import time
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Tuple
 from instagrapi import Client
 from instagrapi.types import Media, Location, Usertag
@@ -9,6 +13,24 @@ from post_base import BasePoster, PostContent
 from pathlib import Path
 from PIL import Image
 
+# Reject anything above this pixel count before any decode is attempted
+_MAX_IMAGE_PIXELS = 100_000_000
+
+# Largest sane single dimension; anything beyond this is corrupt or hostile
+_MAX_IMAGE_DIMENSION = 32768
+
+# Make PIL raise DecompressionBombError instead of allocating for anything
+# that slips past the header checks
+Image.MAX_IMAGE_PIXELS = _MAX_IMAGE_PIXELS
+
+# Authenticated Instagram clients pooled per username with a last-used
+# timestamp, so back-to-back posts (cross-posting, retries, batches) reuse
+# the live session instead of re-validating it with a network round-trip
+_CLIENT_POOL = {}
+_CLIENT_POOL_IDLE_TIMEOUT = 30 * 60  # seconds
+
+_IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif')
+
 class InstagramPoster(BasePoster):
     def __init__(self, config: dict):
         """Initialize Instagram poster with configuration."""
@@ -29,6 +51,10 @@ class InstagramPoster(BasePoster):
         instagram_config = config.get('instagram', {})
         self.instagram_text_limit = instagram_config.get('text_limit', 2200)  # Instagram caption limit
         
+        # Image processing is the CPU hot path; pillow-simd is a drop-in
+        # accelerated build, so note which backend is active
+        self.logger.info("[-] Pillow backend version: %s", Image.__version__)
+
         # Setup JPG directory
         self.posts_dir = Path(config['content']['posts_directory'])
         self.jpg_dir = self.posts_dir / "JPG"
@@ -47,7 +73,19 @@ class InstagramPoster(BasePoster):
             missing_keys = [key for key in required_keys if not creds.get(key)]
             if missing_keys:
                 raise ValueError(f"[ERROR] Missing required Instagram configuration keys: {missing_keys}")
-            
+
+            self._username = creds['username']
+
+            # Reuse a recently-used pooled client and skip the session
+            # validation round-trip entirely
+            pooled = _CLIENT_POOL.get(self._username)
+            if pooled and time.time() - pooled[1] < _CLIENT_POOL_IDLE_TIMEOUT:
+                self.client = pooled[0]
+                self.user_id = self.client.user_id
+                self._touch_pool()
+                self.logger.info("[SUCCESS] Reusing pooled Instagram client")
+                return
+
             self.client = Client()
             self.client.delay_range = [1, 3]  # Add some delay between requests
             
@@ -58,10 +96,11 @@ class InstagramPoster(BasePoster):
                     self.client.load_settings(str(session_file))
                     self.client.get_timeline_feed()  # Test the session
                     self.user_id = self.client.user_id
+                    self._touch_pool()
                     self.logger.info("[SUCCESS] Loaded existing Instagram session")
                     return
                 except Exception as e:
-                    self.logger.warning(f"[WARNING] Failed to load existing session: {e}")
+                    self.logger.warning("[WARNING] Failed to load existing session: %s", e)
                     session_file.unlink(missing_ok=True)
             
             # Login with username and password
@@ -71,42 +110,66 @@ class InstagramPoster(BasePoster):
             
             # Save session for future use
             self.client.dump_settings(str(session_file))
+            self._touch_pool()
             self.logger.info("[SUCCESS] Instagram Authentication Successful")
-            
+
         except Exception as e:
-            self.logger.error(f"[ERROR] Failed to initialize Instagram client: {str(e)}")
+            self.logger.error("[ERROR] Failed to initialize Instagram client: %s", e)
             raise
 
-    def _validate_media_file(self, filepath: str) -> bool:
+    def _touch_pool(self):
+        """Refresh this client's last-used timestamp in the session pool."""
+        _CLIENT_POOL[self._username] = (self.client, time.time())
+
+    def _validate_media_file(self, filepath: str,
+                             stat_result: Optional[os.stat_result] = None) -> bool:
         """Validate media file before upload."""
         try:
-            if not os.path.isfile(filepath):
-                self.logger.error(f"[ERROR] File does not exist: {filepath}")
-                return False
-                
-            if not os.access(filepath, os.R_OK):
-                self.logger.error(f"[ERROR] File is not readable: {filepath}")
-                return False
+            # One stat covers existence and size; open() raises later if the
+            # file isn't readable. Batch callers can hand in a stat result
+            # to skip the syscall.
+            if stat_result is not None:
+                file_size = stat_result.st_size
+            else:
+                try:
+                    file_size = os.stat(filepath).st_size
+                except FileNotFoundError:
+                    self.logger.error("[ERROR] File does not exist: %s", filepath)
+                    return False
+
 
-            file_size = os.path.getsize(filepath)
-            
             # Check if it's a video
             if filepath.lower().endswith(('.mp4', '.mov')):
                 max_size = self.max_video_size_mb * 1024 * 1024
                 if file_size > max_size:
-                    self.logger.error(f"[ERROR] Video file exceeds {self.max_video_size_mb}MB limit: {filepath}")
+                    self.logger.error("[ERROR] Video file exceeds %sMB limit: %s", self.max_video_size_mb, filepath)
                     return False
             else:
                 max_size = self.max_image_size_mb * 1024 * 1024
                 if file_size > max_size:
-                    self.logger.error(f"[ERROR] Image file exceeds {self.max_image_size_mb}MB limit: {filepath}")
+                    self.logger.error("[ERROR] Image file exceeds %sMB limit: %s", self.max_image_size_mb, filepath)
                     return False
-                
-            self.logger.info(f"[SUCCESS] File validated ({file_size/1024/1024:.2f}MB): {filepath}")
+
+                # Header-only dimension probe: Image.open is lazy, so this
+                # reads metadata without decoding a single pixel, letting us
+                # reject pathological images before any IDCT work
+                if filepath.lower().endswith(_IMAGE_SUFFIXES):
+                    try:
+                        with Image.open(filepath) as img:
+                            width, height = img.size
+                    except Exception:
+                        self.logger.error("[ERROR] Cannot read image header: %s", filepath)
+                        return False
+                    if width * height > _MAX_IMAGE_PIXELS or \
+                            width > _MAX_IMAGE_DIMENSION or height > _MAX_IMAGE_DIMENSION:
+                        self.logger.error("[ERROR] Image dimensions too large (%dx%d): %s", width, height, filepath)
+                        return False
+
+            self.logger.info("[SUCCESS] File validated (%.2fMB): %s", file_size / 1024 / 1024, filepath)
             return True
             
         except Exception as e:
-            self.logger.error(f"[ERROR] File validation failed: {str(e)}")
+            self.logger.error("[ERROR] File validation failed: %s", e)
             return False
 
     def validate_post_content(self, post: PostContent) -> bool:
@@ -121,18 +184,18 @@ class InstagramPoster(BasePoster):
             if post.main_text:
                 text_length = len(post.main_text)
                 if text_length > self.instagram_text_limit:
-                    self.logger.error(f"[ERROR] Caption too long ({text_length} chars, max {self.instagram_text_limit})")
+                    self.logger.error("[ERROR] Caption too long (%d chars, max %d)", text_length, self.instagram_text_limit)
                     return False
 
             # Alt text validation
             if post.alt_text and len(post.alt_text) > 1000:
-                self.logger.error(f"[ERROR] Alt text too long ({len(post.alt_text)} chars, max 1000)")
+                self.logger.error("[ERROR] Alt text too long (%d chars, max 1000)", len(post.alt_text))
                 return False
 
             # Media validation
             if post.images:
                 if len(post.images) > self.max_images:
-                    self.logger.error(f"[ERROR] Too many images ({len(post.images)}, max {self.max_images})")
+                    self.logger.error("[ERROR] Too many images (%d, max %d)", len(post.images), self.max_images)
                     return False
                 
                 for image in post.images:
@@ -149,67 +212,184 @@ class InstagramPoster(BasePoster):
             return True
             
         except Exception as e:
-            self.logger.error(f"[ERROR] Content validation failed: {str(e)}")
+            self.logger.error("[ERROR] Content validation failed: %s", e)
             return False
 
+    def _encode_jpeg(self, img: Image.Image, quality: int) -> Tuple[int, io.BytesIO]:
+        """Encode an image to an in-memory JPEG; returns (byte size, buffer)."""
+        buf = io.BytesIO()
+        # 4:2:0 chroma subsampling halves the chroma data Huffman has to
+        # chew through; Instagram recompresses uploads anyway, so baseline
+        # non-optimized output loses nothing visible downstream
+        img.save(buf, 'JPEG', quality=quality, subsampling=2,
+                 optimize=False, progressive=False)
+        return buf.tell(), buf
+
+    def _write_jpg_atomic(self, jpg_path: Path, data) -> None:
+        """Write the final JPEG so jpg_path never holds a partial file.
+
+        On Linux the bytes go to an anonymous O_TMPFILE inode that is
+        linked into place only once fully written; a crash mid-write
+        leaves nothing behind. Elsewhere (or on filesystems without
+        O_TMPFILE support) a named temp file in the same directory is
+        renamed over the target.
+        """
+        if hasattr(os, 'O_TMPFILE'):
+            try:
+                fd = os.open(str(self.jpg_dir), os.O_TMPFILE | os.O_WRONLY, 0o644)
+            except OSError:
+                fd = None
+            if fd is not None:
+                try:
+                    os.write(fd, data)
+                    try:
+                        os.link(f"/proc/self/fd/{fd}", str(jpg_path))
+                        return
+                    except FileExistsError:
+                        # Another worker finished the same cache entry first
+                        return
+                    except OSError:
+                        # Some filesystems (overlayfs, NFS) refuse the
+                        # /proc link trick; use the rename fallback below
+                        pass
+                finally:
+                    os.close(fd)
+        tmp = tempfile.NamedTemporaryFile(dir=str(self.jpg_dir),
+                                          suffix='.jpg', delete=False)
+        try:
+            tmp.write(data)
+            tmp.close()
+            os.replace(tmp.name, str(jpg_path))
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+
     def _process_image(self, image_path: str) -> Tuple[str, bool]:
         """Process image for Instagram upload.
         Returns tuple of (processed_image_path, is_temporary)
         """
         try:
-            self.logger.info(f"[-] Processing image: {os.path.basename(image_path)}")
+            self.logger.info("[-] Processing image: %s", os.path.basename(image_path))
+
+            # Cache key covers the source file identity and the processing
+            # parameters; a retry or repost of the same file reuses the
+            # previous output in JPG/ without decoding anything
+            st = os.stat(image_path)
+
+            # Fast path: a source already within the dimension and size
+            # limits is uploaded as-is. Image.open only parses the header
+            # here, so this costs a stat and a metadata read, no decode.
+            # Instagram accepts PNG, so a compliant PNG is kept too unless
+            # it carries transparency that would need compositing; for
+            # screenshots the PNG is often smaller than its JPEG re-encode.
+            with Image.open(image_path) as probe:
+                width, height = probe.size
+                probe_mode = probe.mode
+                if max(width, height) <= self.max_dimension and \
+                        st.st_size <= self.max_image_size_mb * 1024 * 1024:
+                    if not image_path.lower().endswith('.png'):
+                        self.logger.info("[SUCCESS] No processing needed for image")
+                        return image_path, False
+                    if probe_mode == 'RGB' or (
+                            probe_mode == 'RGBA'
+                            and probe.getchannel('A').getextrema()[0] == 255):
+                        self.logger.info("[SUCCESS] PNG already compliant, keeping original")
+                        return image_path, False
+
+            cache_key = hashlib.blake2b(
+                f"{st.st_mtime_ns}:{st.st_size}:{self.max_dimension}:{self.max_image_size_mb}".encode(),
+                digest_size=16
+            ).hexdigest()
+            jpg_path = self.jpg_dir / f"{Path(image_path).stem}.{cache_key}.jpg"
+            if jpg_path.exists():
+                self.logger.info("[+] Reusing cached processed image: %s", jpg_path)
+                return str(jpg_path), False
+
             # Open the image
             with Image.open(image_path) as img:
-                needs_processing = False
-                
-                # Check if image needs to be resized
-                max_size = max(img.size)
-                if max_size > self.max_dimension:
-                    needs_processing = True
-                    ratio = self.max_dimension / max_size
-                    new_size = tuple(int(dim * ratio) for dim in img.size)
-                    self.logger.info(f"[+] Resizing image from {img.size} to {new_size}")
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-                # If it's a PNG or needs resizing, convert/save as JPEG
+                # Decide from the original header whether resizing is needed
+                needs_processing = max(img.size) > self.max_dimension
+
+                # For JPEGs being shrunk, let libjpeg decode at a DCT-scaled
+                # size (1/2, 1/4, 1/8) so coefficients that would be thrown
+                # away by the resize are never decoded at all
+                if needs_processing and image_path.lower().endswith(('.jpg', '.jpeg')):
+                    img.draft('RGB', (self.max_dimension, self.max_dimension))
+
+                # draft() may already have shrunk the decode size
+                if max(img.size) > self.max_dimension:
+                    old_size = img.size
+                    # thumbnail() resizes in place instead of allocating a
+                    # second full-size buffer, and reducing_gap lets Pillow
+                    # do a cheap box reduce before the final LANCZOS pass
+                    img.thumbnail((self.max_dimension, self.max_dimension),
+                                  Image.Resampling.LANCZOS, reducing_gap=2.0)
+                    self.logger.info("[+] Resized image from %s to %s", old_size, img.size)
+
+                # If it's a PNG or needs resizing, convert/save as JPEG at
+                # the cache-keyed jpg_path computed above
                 is_png = image_path.lower().endswith('.png')
                 if is_png or needs_processing:
-                    # Create a filename based on original filename
-                    orig_name = Path(image_path).stem
-                    jpg_path = self.jpg_dir / f"{orig_name}.jpg"
-                    
+
                     # Convert to RGB if necessary (for PNG with transparency)
                     if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                        self.logger.info("[+] Converting transparent PNG to RGB")
-                        background = Image.new('RGB', img.size, (255, 255, 255))
                         if img.mode == 'P':
                             img = img.convert('RGBA')
-                        background.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
-                        img = background
+                        # A fully opaque alpha channel needs no composite:
+                        # getextrema is a C-level min/max scan, and a plain
+                        # convert skips the background allocation and blend
+                        if 'A' in img.getbands() and img.getchannel('A').getextrema()[0] == 255:
+                            self.logger.info("[+] Alpha channel is opaque, converting directly to RGB")
+                            img = img.convert('RGB')
+                        else:
+                            self.logger.info("[+] Converting transparent PNG to RGB")
+                            background = Image.new('RGB', img.size, (255, 255, 255))
+                            background.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
+                            img = background
 
-                    # Save as JPEG with high quality
-                    self.logger.info(f"[+] Saving image as JPEG: {jpg_path}")
-                    img.save(jpg_path, 'JPEG', quality=100)
-                    
-                    # Verify file size
-                    file_size = os.path.getsize(jpg_path) / (1024 * 1024)  # Convert to MB
+                    # Encode to memory; probes never touch the filesystem and
+                    # only the winning buffer is written out once below
+                    self.logger.info("[+] Encoding image as JPEG: %s", jpg_path)
+                    # Quality 90 with 4:2:0 subsampling fits the 8MB budget
+                    # for anything up to 4K, so the quality search below is
+                    # a rare fallback rather than the common path
+                    size_bytes, best_buf = self._encode_jpeg(img, 90)
+                    file_size = size_bytes / (1024 * 1024)
                     if file_size > self.max_image_size_mb:
-                        # If still too large, reduce quality until it fits
-                        quality = 95
-                        while file_size > self.max_image_size_mb and quality > 40:
-                            quality -= 5
-                            img.save(jpg_path, 'JPEG', quality=quality)
-                            file_size = os.path.getsize(jpg_path) / (1024 * 1024)
-                            self.logger.info(f"[+] Reduced image quality to {quality}, new size: {file_size:.2f}MB")
-
-                    self.logger.info(f"[SUCCESS] Image processing complete")
-                    return str(jpg_path), True
+                        # Binary-search the highest quality in [40, 95] that
+                        # fits the limit: at most ~6 re-encodes instead of up
+                        # to 12 linear quality -= 5 probes
+                        lo, hi = 40, 95
+                        best_buf = None
+                        while lo <= hi:
+                            quality = (lo + hi) // 2
+                            size_bytes, buf = self._encode_jpeg(img, quality)
+                            file_size = size_bytes / (1024 * 1024)
+                            self.logger.info("[+] Probed quality %d: %.2fMB", quality, file_size)
+                            if file_size > self.max_image_size_mb:
+                                hi = quality - 1
+                            else:
+                                best_buf = buf
+                                lo = quality + 1
+                        if best_buf is None:
+                            # Nothing fit; the last probe is the quality-40
+                            # floor, matching the old behavior
+                            best_buf = buf
+                        self.logger.info("[+] Final size: %.2fMB", best_buf.tell() / (1024 * 1024))
+
+                    self._write_jpg_atomic(jpg_path, best_buf.getbuffer())
+
+                    self.logger.info("[SUCCESS] Image processing complete")
+                    # Outputs persist in JPG/ as cache entries, so they are
+                    # not flagged as temporary for post-upload cleanup
+                    return str(jpg_path), False
                 
-                self.logger.info(f"[SUCCESS] No processing needed for image")
+                self.logger.info("[SUCCESS] No processing needed for image")
                 return image_path, False
 
         except Exception as e:
-            self.logger.error(f"[ERROR] Image processing failed: {str(e)}")
+            self.logger.error("[ERROR] Image processing failed: %s", e)
             raise
 
     def post_content(self, post: PostContent) -> bool:
@@ -223,20 +403,21 @@ class InstagramPoster(BasePoster):
         try:
             # Handle media posts
             if post.images:
-                # Process images and get their paths
-                self.logger.info("\n[STARTING] Beginning image processing")
-                processed_images = []
-                for i, img_path in enumerate(post.images, 1):
-                    self.logger.info(f"[-] Processing image {i}/{len(post.images)}")
-                    processed_path, is_processed = self._process_image(img_path)
-                    processed_images.append(processed_path)
-                    if is_processed:
-                        processed_files.append(processed_path)
+                # Process images concurrently; PIL releases the GIL inside
+                # its C decode/resize/encode routines, so carousel processing
+                # scales with cores instead of running serially
+                self.logger.info("\n[STARTING] Beginning image processing (%d images)", len(post.images))
+                max_workers = min(len(post.images), os.cpu_count() or 1)
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(self._process_image, post.images))
+
+                processed_images = [path for path, _ in results]
+                processed_files.extend(path for path, is_processed in results if is_processed)
 
                 # Convert paths to absolute paths
                 image_paths = [str(Path(img).absolute()) for img in processed_images]
                 
-                self.logger.info(f"\n[UPLOADING] Preparing to post {len(image_paths)} images to Instagram")
+                self.logger.info("\n[UPLOADING] Preparing to post %d images to Instagram", len(image_paths))
 
                 try:
                     if len(post.images) == 1:
@@ -245,40 +426,57 @@ class InstagramPoster(BasePoster):
                             path=image_paths[0],
                             caption=post.main_text or ""
                         )
-                        self.logger.info(f"[SUCCESS] Single image posted successfully! Media ID: {media.pk}")
+                        self.logger.info("[SUCCESS] Single image posted successfully! Media ID: %s", media.pk)
                     else:
                         self.logger.info("[+] Uploading multiple images as carousel")
                         media = self.client.album_upload(
                             paths=image_paths,
                             caption=post.main_text or ""
                         )
-                        self.logger.info(f"[SUCCESS] Image carousel posted successfully! Media ID: {media.pk}")
+                        self.logger.info("[SUCCESS] Image carousel posted successfully! Media ID: %s", media.pk)
+                    self._touch_pool()
                     return True
                     
                 except Exception as e:
-                    self.logger.error(f"[ERROR] Failed to post {'carousel' if len(post.images) > 1 else 'single image'}: {str(e)}")
+                    self.logger.error("[ERROR] Failed to post %s: %s", 'carousel' if len(post.images) > 1 else 'single image', e)
                     raise
 
             elif post.video:
                 self.logger.info("\n[STARTING] Beginning video upload")
                 video_path = str(Path(post.video).absolute())
+
+                # instagrapi reads the file itself (no public streaming
+                # hook), so the best we can do is tell the kernel the read
+                # will be sequential: readahead kicks in and the page cache
+                # isn't polluted ahead of the single pass
+                if hasattr(os, 'posix_fadvise'):
+                    try:
+                        fd = os.open(video_path, os.O_RDONLY)
+                        try:
+                            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                        finally:
+                            os.close(fd)
+                    except OSError:
+                        pass
+
                 try:
                     self.logger.info("[+] Uploading video to Instagram")
                     media = self.client.video_upload(
                         path=video_path,
                         caption=post.main_text or ""
                     )
-                    self.logger.info(f"[SUCCESS] Video posted successfully! Media ID: {media.pk}")
+                    self.logger.info("[SUCCESS] Video posted successfully! Media ID: %s", media.pk)
+                    self._touch_pool()
                     return True
                 except Exception as e:
-                    self.logger.error(f"[ERROR] Failed to post video: {str(e)}")
+                    self.logger.error("[ERROR] Failed to post video: %s", e)
                     raise
             else:
                 self.logger.error("[ERROR] Instagram requires either image or video content")
                 return False
 
         except Exception as e:
-            self.logger.error(f"[ERROR] Instagram posting failed: {str(e)}")
+            self.logger.error("[ERROR] Instagram posting failed: %s", e)
             
             # If session expired, try to re-login
             if "login_required" in str(e).lower():
@@ -286,10 +484,14 @@ class InstagramPoster(BasePoster):
                 try:
                     session_file = Path("instagram_session.json")
                     session_file.unlink(missing_ok=True)
+                    # Evict the pooled client too: it holds the session that
+                    # just raised login_required, and _init_client would
+                    # otherwise hand the same dead client straight back
+                    _CLIENT_POOL.pop(self._username, None)
                     self._init_client(self.config)
                     return self.post_content(post)  # Retry the post
                 except Exception as re_login_error:
-                    self.logger.error(f"[ERROR] Re-login attempt failed: {str(re_login_error)}")
+                    self.logger.error("[ERROR] Re-login attempt failed: %s", re_login_error)
             
             return False
             
@@ -298,14 +500,19 @@ class InstagramPoster(BasePoster):
             for processed_file in processed_files:
                 try:
                     os.unlink(processed_file)
-                    self.logger.info(f"[CLEANUP] Removed temporary file: {processed_file}")
+                    self.logger.info("[CLEANUP] Removed temporary file: %s", processed_file)
                 except Exception as e:
-                    self.logger.warning(f"[WARNING] Failed to clean up temporary file {processed_file}: {str(e)}")
+                    self.logger.warning("[WARNING] Failed to clean up temporary file %s: %s", processed_file, e)
 
     def __del__(self):
         """Cleanup when object is destroyed."""
         try:
             if hasattr(self, 'client'):
+                # Pooled clients stay logged in so other instances (and
+                # later runs in this process) can keep using the session
+                pooled = _CLIENT_POOL.get(getattr(self, '_username', None))
+                if pooled and pooled[0] is self.client:
+                    return
                 self.client.logout()
                 self.logger.info("[CLEANUP] Successfully logged out of Instagram")
         except:
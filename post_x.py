@@ -1,9 +1,126 @@
 import os
+import mmap
+import json
+import time
+import hashlib
 import logging
+import tempfile
+import threading
+import requests
 import tweepy
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from post_base import BasePoster, PostContent
 
+# Authenticated (client, api) pairs cached per credential tuple so repeated
+# XPoster constructions in one process reuse the same keep-alive sessions
+# instead of re-running OAuth setup and credential verification
+_CLIENT_CACHE: Dict[Tuple, Tuple] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# Credentials that must be present and non-empty in config['x']
+_REQUIRED_X_KEYS = frozenset({'api_key', 'api_secret', 'access_token',
+                              'access_token_secret', 'bearer_token'})
+
+# Uploaded media IDs keyed by SHA256(file bytes + alt text), so a retry
+# after a failed create_tweet reuses the id instead of re-uploading the
+# same bytes. X keeps uploaded media for ~24h; expire under that.
+_MEDIA_CACHE_PATH = Path.home() / '.phong-bot' / 'media_cache.json'
+_MEDIA_CACHE_TTL = 23 * 60 * 60  # seconds
+_MEDIA_CACHE_LOCK = threading.Lock()
+
+# verify_credentials() returns the same user object for as long as the
+# tokens are valid; remember a successful check per credential hash so
+# back-to-back runs skip the round-trip for an hour
+_AUTH_CACHE_PATH = Path.home() / '.phong-bot' / 'auth_cache.json'
+_AUTH_CACHE_TTL = 60 * 60  # seconds
+
+
+def _auth_cache_fresh(cred_hash: str) -> bool:
+    try:
+        cache = json.loads(_AUTH_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return False
+    return cache.get(cred_hash, {}).get('expires', 0) > time.time()
+
+
+def _auth_cache_mark(cred_hash: str) -> None:
+    try:
+        cache = json.loads(_AUTH_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    now = time.time()
+    cache = {k: v for k, v in cache.items() if v.get('expires', 0) > now}
+    cache[cred_hash] = {'expires': now + _AUTH_CACHE_TTL}
+    _AUTH_CACHE_PATH.parent.mkdir(exist_ok=True)
+    _AUTH_CACHE_PATH.write_text(json.dumps(cache))
+
+
+class _RateBucket:
+    """Token bucket pacing API calls before they are sent.
+
+    tweepy's wait_on_rate_limit only reacts after a request has been
+    sent and rejected with a 429, wasting that call and then blocking
+    for the rest of the window. Pacing locally spends the budget
+    up front: a burst sleeps briefly before sending instead.
+    """
+
+    def __init__(self, rate: int = 50, per: float = 15 * 60):
+        self.capacity = rate
+        self.fill_rate = rate / per  # tokens per second
+        self.tokens = float(rate)
+        self.last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping first if the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.last_update) * self.fill_rate)
+            self.last_update = now
+            # Going negative queues concurrent waiters fairly: each
+            # computes a successively longer sleep
+            wait = max(0.0, (1 - self.tokens) / self.fill_rate)
+            self.tokens -= 1
+        if wait:
+            time.sleep(wait)
+
+
+# One bucket for the process: clients are cached per credential tuple, so
+# all posts in a run draw from the same local budget
+_RATE_BUCKET = _RateBucket()
+
+
+def _media_cache_read() -> dict:
+    try:
+        with open(_MEDIA_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _media_cache_get(key: str) -> Optional[int]:
+    entry = _media_cache_read().get(key)
+    if entry and entry.get('expires', 0) > time.time():
+        return entry['media_id']
+    return None
+
+
+def _media_cache_put(key: str, media_id: int) -> None:
+    with _MEDIA_CACHE_LOCK:
+        now = time.time()
+        cache = {k: v for k, v in _media_cache_read().items()
+                 if v.get('expires', 0) > now}
+        cache[key] = {'media_id': media_id, 'expires': now + _MEDIA_CACHE_TTL}
+        _MEDIA_CACHE_PATH.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(_MEDIA_CACHE_PATH.parent),
+                                   prefix='.media_cache.')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp, _MEDIA_CACHE_PATH)
+
 class XPoster(BasePoster):
     def __init__(self, config: dict):
         """Initialize X/Twitter poster with configuration."""
@@ -16,12 +133,21 @@ class XPoster(BasePoster):
     def _init_client(self, config: dict):
         """Initialize X/Twitter API client."""
         try:
-            # Verify required credentials exist
-            required_keys = ['api_key', 'api_secret', 'access_token', 
-                           'access_token_secret', 'bearer_token']
-            missing_keys = [key for key in required_keys if not config.get(key)]
+            # Verify required credentials exist; a set difference is one
+            # C-level operation instead of a per-key .get loop
+            missing_keys = _REQUIRED_X_KEYS - {k for k, v in config.items() if v}
             if missing_keys:
-                raise ValueError(f"Missing required X configuration keys: {missing_keys}")
+                raise ValueError(f"Missing required X configuration keys: {sorted(missing_keys)}")
+
+            cache_key = (config['api_key'], config['api_secret'],
+                         config['access_token'], config['access_token_secret'],
+                         config['bearer_token'])
+            with _CLIENT_CACHE_LOCK:
+                cached = _CLIENT_CACHE.get(cache_key)
+            if cached:
+                self.client, self.api = cached
+                self.logger.info("Reusing cached X/Twitter client")
+                return
 
             # Initialize OAuth handler
             auth = tweepy.OAuthHandler(
@@ -45,62 +171,158 @@ class XPoster(BasePoster):
             
             # Initialize API (needed for media upload)
             self.api = tweepy.API(auth)
-            self.api.verify_credentials()
-            self.logger.info("X/Twitter Authentication Successful")
+
+            # Both tweepy objects default to separate stock sessions
+            # (10-connection pools, no retries). Sharing one session with a
+            # larger pool lets media uploads, metadata calls, and
+            # create_tweet reuse keep-alive connections and TLS session
+            # tickets instead of paying a fresh handshake per call
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=20, pool_maxsize=20, max_retries=3)
+            session.mount('https://', adapter)
+            self.api.session = session
+            self.client.session = session
+
+            # verify_credentials() is a full network round-trip that counts
+            # against the rate limit; bad tokens surface on the first real
+            # call anyway, so only verify eagerly when explicitly requested
+            if os.getenv("POSTER_VERIFY_CREDENTIALS", "0") == "1":
+                cred_hash = hashlib.sha256(
+                    f"{config['api_key']}{config['access_token']}".encode()
+                ).hexdigest()
+                if _auth_cache_fresh(cred_hash):
+                    self.logger.info("Auth cache hit; skipping verify_credentials")
+                else:
+                    self.api.verify_credentials()
+                    _auth_cache_mark(cred_hash)
+                    self.logger.info("X/Twitter Authentication Successful")
+            else:
+                self.logger.info("X/Twitter client initialized (credential verification deferred)")
+
+            with _CLIENT_CACHE_LOCK:
+                _CLIENT_CACHE[cache_key] = (self.client, self.api)
             
         except Exception as e:
-            self.logger.error(f"Failed to initialize X client: {str(e)}")
+            self.logger.error("Failed to initialize X client: %s", e)
             raise
 
     def _upload_chunked_video(self, video_path: str) -> Optional[int]:
         """Upload a video in chunks."""
         try:
             file_size = os.path.getsize(video_path)
-            self.logger.info(f"[-] Initiating video upload: {os.path.basename(video_path)}")
-            
-            # INIT
-            upload = self.api.chunked_upload(filename=video_path, file_size=file_size)
-            
-            # APPEND
-            chunk_size = 1024 * 1024  # 1MB chunks
-            with open(video_path, 'rb') as file:
-                bytes_sent = 0
-                while bytes_sent < file_size:
-                    chunk = file.read(chunk_size)
-                    if not chunk:
-                        break
-                    upload = self.api.chunked_upload(chunk, 
-                                                file_size=file_size,
-                                                media_id=upload.media_id,
-                                                segment_index=bytes_sent // chunk_size)
-                    bytes_sent += len(chunk)
-            
+            self.logger.info("[-] Initiating video upload: %s", os.path.basename(video_path))
+
+            # INIT - media_category routes large videos through X's async
+            # processing pipeline so FINALIZE doesn't reject them
+            media_type = 'video/quicktime' if video_path.lower().endswith('.mov') else 'video/mp4'
+            _RATE_BUCKET.acquire()
+            upload = self.api.chunked_upload_init(
+                total_bytes=file_size,
+                media_type=media_type,
+                media_category='tweet_video'
+            )
+            media_id = upload.media_id
+
+            # APPEND - 5MB chunks with four in flight. X accepts segment
+            # indices out of order, so wall time is bounded by bandwidth
+            # rather than one round-trip per megabyte
+            chunk_size = 5 * 1024 * 1024
+            total_chunks = (file_size + chunk_size - 1) // chunk_size
+
+            # One shared read-only mapping; each worker slices a zero-copy
+            # memoryview window instead of read()-ing a fresh bytes object
+            # off the page cache per chunk. requests accepts the buffer
+            # directly, so no intermediate copy is made either.
+            with open(video_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    def _append_segment(idx: int):
+                        chunk = view[idx * chunk_size:(idx + 1) * chunk_size]
+                        try:
+                            self.api.chunked_upload_append(media_id, chunk, idx)
+                        finally:
+                            # every exported slice must be released before
+                            # the mapping itself can close
+                            chunk.release()
+
+                    with ThreadPoolExecutor(max_workers=min(4, total_chunks)) as executor:
+                        list(executor.map(_append_segment, range(total_chunks)))
+                finally:
+                    view.release()
+
             # FINALIZE
             self.logger.info("[+] Finalizing video upload...")
-            media = self.api.chunked_upload(media_id=upload.media_id, status='FINALIZE')
-            
-            self.logger.info(f"[SUCCESS] Video upload complete - Media ID: {media.media_id}")
+            media = self.api.chunked_upload_finalize(media_id)
+
+            # tweet_video uploads finalize asynchronously: the response
+            # carries processing_info in state pending/in_progress until X
+            # has transcoded the file, and create_tweet rejects the id
+            # until then. Poll at the cadence the API asks for.
+            processing_info = getattr(media, 'processing_info', None)
+            while processing_info and processing_info.get('state') in ('pending', 'in_progress'):
+                wait = processing_info.get('check_after_secs', 5)
+                self.logger.info("[+] Video processing %s; checking again in %ss",
+                                 processing_info.get('state'), wait)
+                time.sleep(wait)
+                media = self.api.get_media_upload_status(media_id)
+                processing_info = getattr(media, 'processing_info', None)
+
+            if processing_info and processing_info.get('state') == 'failed':
+                self.logger.error("[ERROR] Video processing failed: %s",
+                                  processing_info.get('error'))
+                return None
+
+            self.logger.info("[SUCCESS] Video upload complete - Media ID: %s", media.media_id)
             return media.media_id
             
         except Exception as e:
-            self.logger.error(f"[ERROR] Failed to upload video {video_path}: {str(e)}")
+            self.logger.error("[ERROR] Failed to upload video %s: %s", video_path, e)
             return None
 
-    def _upload_image(self, image_path: str, alt_text: Optional[str] = None) -> Optional[int]:
-        """Upload an image."""
+    def _upload_image(self, image_path: str, alt_text: Optional[str] = None,
+                      metadata_pool: Optional[ThreadPoolExecutor] = None,
+                      metadata_futures: Optional[List] = None) -> Optional[int]:
+        """Upload an image.
+
+        When a metadata_pool is supplied, the alt-text call is submitted
+        there instead of awaited inline, so one image's metadata
+        round-trip overlaps the other images' uploads. The caller must
+        drain the collected futures before attaching the media to a
+        tweet: metadata applied after attachment isn't guaranteed to
+        take effect.
+        """
         try:
-            self.logger.info(f"[-] Processing image: {os.path.basename(image_path)}")
+            self.logger.info("[-] Processing image: %s", os.path.basename(image_path))
+
+            # A retry after a failed create_tweet can reuse the media id
+            # from the previous run instead of re-uploading the same bytes
+            with open(image_path, 'rb') as f:
+                cache_key = hashlib.sha256(
+                    f.read() + (alt_text or '').encode()).hexdigest()
+            cached_id = _media_cache_get(cache_key)
+            if cached_id is not None:
+                self.logger.info("[+] Reusing cached media ID: %s", cached_id)
+                return cached_id
+
+            _RATE_BUCKET.acquire()
             media = self.api.media_upload(filename=image_path)
-                
+
             if alt_text:
                 self.logger.info("[+] Adding alt text description...")
-                self.api.create_media_metadata(media.media_id, alt_text)
-                
-            self.logger.info(f"[SUCCESS] Image uploaded successfully - Media ID: {media.media_id}")
+                if metadata_pool is not None:
+                    metadata_futures.append(metadata_pool.submit(
+                        self.api.create_media_metadata, media.media_id, alt_text))
+                else:
+                    self.api.create_media_metadata(media.media_id, alt_text)
+
+            _media_cache_put(cache_key, media.media_id)
+            self.logger.info("[SUCCESS] Image uploaded successfully - Media ID: %s", media.media_id)
             return media.media_id
             
         except Exception as e:
-            self.logger.error(f"[ERROR] Failed to upload image {image_path}: {str(e)}")
+            self.logger.error("[ERROR] Failed to upload image %s: %s", image_path, e)
             return None
 
     def post_content(self, post: PostContent) -> bool:
@@ -109,34 +331,65 @@ class XPoster(BasePoster):
             self.logger.error("[ERROR] Content validation failed")
             return False
 
+        media_ids = []
+        metadata_pool: Optional[ThreadPoolExecutor] = None
+        metadata_futures: List = []
         try:
-            media_ids = []
-            
             # Handle images if present
             if post.images:
                 # Limit to max 4 images for X
                 images_to_upload = post.images[:self.max_images]
                 if len(post.images) > self.max_images:
-                    self.logger.warning(f"[NOTICE] X supports maximum {self.max_images} images. Additional images will be omitted.")
+                    self.logger.warning("[NOTICE] X supports maximum %d images. Additional images will be omitted.", self.max_images)
                 
-                self.logger.info(f"\n[STARTING] Processing {len(images_to_upload)} images for upload")
-                for i, image in enumerate(images_to_upload, 1):
-                    if not self._validate_media_file(image):
-                        self.logger.error(f"[ERROR] Image validation failed: {image}")
-                        return False
-                    
-                    media_id = self._upload_image(image, post.alt_text)
-                    if media_id:
-                        media_ids.append(media_id)
-                        self.logger.info(f"[PROGRESS] Image {i}/{len(images_to_upload)} processed successfully")
-                    else:
+                self.logger.info("\n[STARTING] Processing %d images for upload", len(images_to_upload))
+
+                # Validate everything up front with one stat pass, then
+                # upload concurrently - each upload is a blocking HTTPS
+                # request, so wall time is bounded by the slowest image
+                stats = {}
+                for image in images_to_upload:
+                    try:
+                        stats[image] = os.stat(image)
+                    except OSError:
+                        stats[image] = None  # validator logs the miss
+                for image in images_to_upload:
+                    if not self._validate_media_file(image, stats[image]):
+                        self.logger.error("[ERROR] Image validation failed: %s", image)
                         return False
 
+                # Alt-text metadata goes to its own pool so each image's
+                # metadata call overlaps the remaining uploads
+                if post.alt_text:
+                    metadata_pool = ThreadPoolExecutor(max_workers=2)
+
+                with ThreadPoolExecutor(max_workers=len(images_to_upload)) as executor:
+                    results = list(executor.map(
+                        lambda image: self._upload_image(
+                            image, post.alt_text, metadata_pool, metadata_futures),
+                        images_to_upload
+                    ))
+
+                if any(media_id is None for media_id in results):
+                    return False
+                media_ids = results
+
+                # Drain metadata before create_tweet: alt text applied
+                # after the media is attached isn't guaranteed to stick.
+                # A failure is logged but doesn't block the post.
+                for future in metadata_futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.logger.warning("[WARNING] Alt text metadata failed: %s", e)
+                metadata_futures.clear()
+                self.logger.info("[PROGRESS] %d/%d images processed successfully", len(media_ids), len(images_to_upload))
+
             # Handle video if present
             elif post.video:
                 self.logger.info("\n[STARTING] Processing video upload")
                 if not self._validate_media_file(post.video):
-                    self.logger.error(f"[ERROR] Video validation failed: {post.video}")
+                    self.logger.error("[ERROR] Video validation failed: %s", post.video)
                     return False
                 
                 media_id = self._upload_chunked_video(post.video)
@@ -147,15 +400,16 @@ class XPoster(BasePoster):
 
             # Create the tweet
             self.logger.info("[FINALIZING] Preparing to post content...")
+            _RATE_BUCKET.acquire()
             response = self.client.create_tweet(
                 text=post.main_text if post.main_text else None,
                 media_ids=media_ids if media_ids else None
             )
-            
+
             if response and hasattr(response, 'data'):
                 tweet_id = response.data['id']
-                self.logger.info(f"\n[SUCCESS] Content successfully posted to X!")
-                self.logger.info(f"[DETAILS] Tweet ID: {tweet_id}")
+                self.logger.info("\n[SUCCESS] Content successfully posted to X!")
+                self.logger.info("[DETAILS] Tweet ID: %s", tweet_id)
                 self.logger.info("[STATUS] All operations completed successfully")
                 return True
             else:
@@ -163,11 +417,23 @@ class XPoster(BasePoster):
                 return False
 
         except tweepy.TweepyException as e:
-            self.logger.error(f"\n[ERROR] Failed to post to X: {str(e)}")
+            self.logger.error("\n[ERROR] Failed to post to X: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"\n[ERROR] Unexpected error occurred: {str(e)}")
+            self.logger.error("\n[ERROR] Unexpected error occurred: %s", e)
             return False
+        finally:
+            # Backstop for early-return and exception paths: the success
+            # path has already drained and cleared the futures above. Shut
+            # the pool down on every exit so its threads are never
+            # abandoned.
+            for future in metadata_futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.warning("[WARNING] Alt text metadata failed: %s", e)
+            if metadata_pool is not None:
+                metadata_pool.shutdown()
 
     def _validate_rate_limits(self):
         """Check current rate limit status."""
@@ -175,9 +441,9 @@ class XPoster(BasePoster):
             limits = self.api.rate_limit_status()
             status = limits['resources']['statuses']['/statuses/update']
             self.logger.info("\n[RATE LIMITS]")
-            self.logger.info(f"[-] Remaining posts: {status['remaining']}/{status['limit']}")
-            self.logger.info(f"[-] Reset time: {status['reset']} seconds")
+            self.logger.info("[-] Remaining posts: %s/%s", status['remaining'], status['limit'])
+            self.logger.info("[-] Reset time: %s seconds", status['reset'])
             return True
         except Exception as e:
-            self.logger.warning(f"\n[WARNING] Unable to check rate limits: {str(e)}")
+            self.logger.warning("\n[WARNING] Unable to check rate limits: %s", e)
             return False
\ No newline at end of file
@@ -1,53 +1,70 @@
-import json
 import os
+import tempfile
 from pathlib import Path
 
+# orjson parses JSON several times faster than the stdlib; fall back
+# silently when the C extension isn't installed
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def _json_loads(data):
+        return json.loads(data)
+
+# Which config.json keys land in .env, per platform section. Adding a
+# platform or credential means one line here, not another f-string block.
+KEY_MAP = [
+    ('x', [
+        ('TWITTER_API_KEY', 'api_key'),
+        ('TWITTER_API_SECRET', 'api_secret'),
+        ('TWITTER_ACCESS_TOKEN', 'access_token'),
+        ('TWITTER_ACCESS_TOKEN_SECRET', 'access_token_secret'),
+        ('TWITTER_BEARER_TOKEN', 'bearer_token'),
+    ]),
+    ('threads', [
+        ('THREADS_API_KEY', 'api_key'),
+        ('THREADS_API_SECRET', 'api_secret'),
+        ('THREADS_ACCESS_TOKEN', 'access_token'),
+        ('THREADS_USERNAME', 'instagram_username'),
+        ('THREADS_PASSWORD', 'instagram_password'),
+    ]),
+]
+
 def update_env_file():
     """Update .env file from config.json"""
     try:
         # Read config.json
-        with open('config.json', 'r') as f:
-            config = json.load(f)
-        
-        # Create .env content
-        env_content = []
-        
-        # Add X/Twitter credentials
-        if config['x']['enabled']:
-            env_content.extend([
-                f"TWITTER_API_KEY={config['x']['api_key']}",
-                f"TWITTER_API_SECRET={config['x']['api_secret']}",
-                f"TWITTER_ACCESS_TOKEN={config['x']['access_token']}",
-                f"TWITTER_ACCESS_TOKEN_SECRET={config['x']['access_token_secret']}",
-                f"TWITTER_BEARER_TOKEN={config['x']['bearer_token']}"
-            ])
-        
-        # Add Threads credentials
-        if config['threads']['enabled']:
-            env_content.extend([
-                f"THREADS_API_KEY={config['threads']['api_key']}",
-                f"THREADS_API_SECRET={config['threads']['api_secret']}",
-                f"THREADS_ACCESS_TOKEN={config['threads']['access_token']}",
-                f"THREADS_USERNAME={config['threads']['instagram_username']}",
-                f"THREADS_PASSWORD={config['threads']['instagram_password']}"
-            ])
-        
-        # Write to .env file
-        with open('.env', 'w') as f:
-            f.write('\n'.join(env_content))
-        
-        # Set proper permissions on Unix-like systems
-        if os.name != 'nt':
-            Path('.env').chmod(0o600)
-            
+        config = _json_loads(Path('config.json').read_bytes())
+
+        # Create .env content for each enabled platform section
+        env_content = [
+            f"{env_key}={config[section][cfg_key]}"
+            for section, pairs in KEY_MAP
+            if config[section]['enabled']
+            for env_key, cfg_key in pairs
+        ]
+
+        # Write to a same-directory temp file and rename it into place, so
+        # a crash mid-write can't leave a truncated .env. mkstemp creates
+        # the file 0600, so the credentials are never world-readable, even
+        # for an instant.
+        fd, tmp = tempfile.mkstemp(dir='.', prefix='.env.')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(env_content))
+            os.replace(tmp, '.env')
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
         print("Successfully updated .env file")
-        
+
     except Exception as e:
         print(f"Error updating .env file: {str(e)}")
 
 if __name__ == "__main__":
     update_env_file()
-
-
-
-